@@ -9,27 +9,30 @@ flagged.
 
 import os
 import re
+import string
 import sys
+from collections.abc import Iterable
 from pathlib import Path
+from typing import Optional
 
 import metomi.isodatetime.parsers as parse
 from constants import (
-    DATA,
+    COMPILED_REGEX,
     DATETIME_FIELDS,
     META_FIELDS,
-    METADATA,
-    MISC,
+    NO_RESPONSE,
     PARENT_REQUIRED,
-    REGEX_FORMAT,
     REQUIRED,
+    SECTION_FIELDS,
+    STANDARD_DATETIME_FIELDS,
 )
-from metomi.isodatetime.data import Calendar
+from metomi.isodatetime.data import Calendar, TimePoint
 from metomi.isodatetime.exceptions import ISO8601SyntaxError, IsodatetimeError
 
-REGEX_DICT = {
-    "workflow_pattern": re.compile(REGEX_FORMAT["model_workflow_id"]),
-    "variant_pattern": re.compile(REGEX_FORMAT["variant_label"]),
-}
+ISSUE_FIELD_PATTERN = re.compile(r"### (.+?)\n\s*\n?(.+)")
+TIME_POINT_PARSER = parse.TimePointParser()
+# Lower cases the issue form headings and replaces spaces with underscores in a single pass.
+KEY_TRANSLATION = str.maketrans(string.ascii_uppercase + " ", string.ascii_lowercase + "_")
 
 
 def get_issue() -> dict[str, str]:
@@ -68,39 +71,34 @@ def set_calendar(calendar_type: str) -> dict[str, str]:
     return errors
 
 
-def normalise_datetime(datetime: str, errors: dict[str, str], key: str) -> tuple[str, dict[str, str]]:
+def normalise_datetime(datetime: str) -> tuple[str, Optional[TimePoint]]:
     """Normalises any acceptable datetime string into yyyy-mm-ddTHH:MM:SSZ format.
 
     Parameters
     ----------
     datetime : str
         The datetime string to normalise.
-    errors : dict[str, str]
-        A dictionary containing any errors caused by user input from the form.
-    key : str
-        The datetime field being normalised.
 
     Returns
     -------
-    tuple[str, dict[str, str]]
-        The normalised string and the dictionary of errors.
+    tuple[str, Optional[TimePoint]]
+        The normalised string and the parsed time point. If the datetime string is invalid it is returned unchanged
+        with no time point.
     """
     try:
-        parser = parse.TimePointParser()
-        normalised_str = str(parser.parse(datetime))
+        time_point = TIME_POINT_PARSER.parse(datetime)
     except (IsodatetimeError, ISO8601SyntaxError):
-        errors["datetime"] = f"Invalid datetime format for {key}"
-        normalised_str = datetime
+        return datetime, None
 
-    return normalised_str, errors
+    return str(time_point), time_point
 
 
-def process_metadata(match: list[tuple[str]]) -> dict[str, str]:
+def process_metadata(fields: Iterable[tuple[str, str]]) -> dict[str, str]:
     """Generates a dictionary from the loaded issue body and cleans the contents to ensure consistent formatting.
 
     Parameters
     ----------
-    match : list[tuple[str]]
+    fields : Iterable[tuple[str, str]]
         The identified key-value pairs from the issue body.
 
     Returns
@@ -108,84 +106,155 @@ def process_metadata(match: list[tuple[str]]) -> dict[str, str]:
     dict[str, str]
         A cleaned dictionary containing the metadata keys and values from the issue form.
     """
-    meta_dict = {}
+    # Seed the keys in CV order so that generated files keep a consistent layout.
+    meta_dict = dict.fromkeys(META_FIELDS.values(), "")
 
-    # Clean parsed data
-    for key, value in set(match):
-        clean = key.strip().lower().replace(" ", "_")
-        meta_dict[clean] = value.strip()
+    # Clean parsed data, re map keys to correct CV format and reformat blank fields in a single pass. Repeated
+    # headings are deduplicated by key, with the last occurrence taking precedence.
+    for key, value in fields:
+        clean = key.strip().translate(KEY_TRANSLATION)
+        value = value.strip()
+        meta_dict[META_FIELDS.get(clean, clean)] = "" if value == NO_RESPONSE else value
 
-    # Re map keys to correct CV format
-    for old_key, new_key in META_FIELDS.items():
-        meta_dict[new_key] = meta_dict.pop(old_key)
+    return meta_dict
 
-    # Reformat blank fields.
-    for key, value in meta_dict.items():
-        if meta_dict[key] == "_No response_":
-            meta_dict[key] = ""
 
-    return meta_dict
+def validate_mass_data_class(value: str, meta_dict: dict[str, str], errors: dict[str, str]) -> None:
+    """Validates the mass data class against the mass ensemble member.
+
+    Parameters
+    ----------
+    value : str
+        The mass data class.
+    meta_dict : dict[str, str]
+        A cleaned dictionary containing the metadata keys and values from the issue form.
+    errors : dict[str, str]
+        A dictionary containing any errors caused by user input from the form.
+    """
+    if value == "ens" and not meta_dict.get("mass_ensemble_member"):
+        errors["missing_mass_field"] = "Missing field: mass_data_class"
+    if value == "crum" and meta_dict.get("mass_ensemble_member"):
+        errors["unexpected_mass_field"] = "Unexpected field: mass_data_class"
+
+
+def validate_branch_method(value: str, meta_dict: dict[str, str], errors: dict[str, str]) -> None:
+    """Validates that the parent fields are consistent with the branch method.
+
+    Parameters
+    ----------
+    value : str
+        The branch method.
+    meta_dict : dict[str, str]
+        A cleaned dictionary containing the metadata keys and values from the issue form.
+    errors : dict[str, str]
+        A dictionary containing any errors caused by user input from the form.
+    """
+    provided = {key for key in PARENT_REQUIRED if meta_dict.get(key)}
+    if value == "standard" and provided != PARENT_REQUIRED:
+        missing = ", ".join(sorted(PARENT_REQUIRED - provided))
+        errors["missing_parent_field"] = f"Missing required parent fields: {missing}"
+    elif value == "no parent" and provided:
+        errors["unexpected_parent_field"] = f"Unexpected fields: {', '.join(sorted(provided))}"
+
+
+def validate_workflow_id(value: str, meta_dict: dict[str, str], errors: dict[str, str]) -> None:
+    """Validates the model workflow ID structure.
+
+    Parameters
+    ----------
+    value : str
+        The model workflow ID.
+    meta_dict : dict[str, str]
+        A cleaned dictionary containing the metadata keys and values from the issue form.
+    errors : dict[str, str]
+        A dictionary containing any errors caused by user input from the form.
+    """
+    if COMPILED_REGEX["model_workflow_id"].fullmatch(value) is None:
+        errors["workflow_id_format"] = "Model workflow ID is incorrectly formatted: expected a-bc123"
+
+
+def validate_variant_label(value: str, meta_dict: dict[str, str], errors: dict[str, str]) -> None:
+    """Validates the variant label structure.
+
+    Parameters
+    ----------
+    value : str
+        The variant label.
+    meta_dict : dict[str, str]
+        A cleaned dictionary containing the metadata keys and values from the issue form.
+    errors : dict[str, str]
+        A dictionary containing any errors caused by user input from the form.
+    """
+    if COMPILED_REGEX["variant_label"].fullmatch(value) is None:
+        errors["label_format"] = "Variant label is incorrectly formatted: expected r1i1p1f2 like format"
+
+
+def validate_atmos_timestep(value: str, meta_dict: dict[str, str], errors: dict[str, str]) -> None:
+    """Validates that the atmospheric timestep is an integer.
+
+    Parameters
+    ----------
+    value : str
+        The atmospheric timestep.
+    meta_dict : dict[str, str]
+        A cleaned dictionary containing the metadata keys and values from the issue form.
+    errors : dict[str, str]
+        A dictionary containing any errors caused by user input from the form.
+    """
+    if not (value.isascii() and value.isdigit()):
+        errors["timestep_logic"] = "Atmospheric timestep is invalid"
 
 
-def validate_meta_content(meta_dict: dict[str, str]) -> dict[str, str]:
-    """Validates the metadata dictionary contents.
+VALIDATORS = {
+    "mass_data_class": validate_mass_data_class,
+    "branch_method": validate_branch_method,
+    "model_workflow_id": validate_workflow_id,
+    "variant_label": validate_variant_label,
+    "atmos_timestep": validate_atmos_timestep,
+}
+
+
+def validate_meta_content(meta_dict: dict[str, str], errors: dict[str, str]) -> dict[str, str]:
+    """Validates the metadata dictionary contents. The calendar must already have been set with set_calendar().
 
     Parameters
     ----------
     meta_dict : dict[str, str]
         A cleaned dictionary containing the metadata keys and values from the issue form.
+    errors : dict[str, str]
+        A dictionary containing any errors already found, such as those returned by set_calendar().
 
     Returns
     -------
     dict[str, str]
         A dictionary containing any errors caused by user input from the form.
     """
-    errors = set_calendar(meta_dict["calendar"])
-    # Confirm that conditional fields are present.
+    # Confirm that required fields are present.
+    missing = REQUIRED - {key for key, value in meta_dict.items() if value}
+    if missing:
+        errors["missing_required_field"] = f"Missing fields: {', '.join(sorted(missing))}"
+
+    # Apply the field specific validators.
     for key, value in meta_dict.items():
-        if key in REQUIRED and not value:
-            errors["missing_required_field"] = f"Missing field {key}"
-
-        if key == "mass_data_class":
-            if value == "ens" and not meta_dict.get("mass_ensemble_member"):
-                errors["missing_mass_field"] = f"Missing field: {key}"
-            if value == "crum" and meta_dict.get("mass_ensemble_member"):
-                errors["unexpected_mass_field"] = f"Unexpected field: {key}"
-
-        if key == "branch_method":
-            if value == "standard":
-                for parent_key in PARENT_REQUIRED:
-                    if meta_dict.get(parent_key) in (None, "", "_No response_"):
-                        errors["missing_parent_field"] = f"Missing required parent field: {parent_key}"
-            elif value == "no parent":
-                for parent_key in PARENT_REQUIRED:
-                    if meta_dict.get(parent_key) not in (None, "", "_No response_"):
-                        errors["unexpected_parent_field"] = f"Unexpected field: {parent_key}"
-
-        # Verify datetime inputs
-        if key == "branch_method" and value == "standard":
-            DATETIME_FIELDS.add("branch_date_in_child")
-            DATETIME_FIELDS.add("branch_date_in_parent")
-        if key in DATETIME_FIELDS:
-            normal_datetime, errors = normalise_datetime(meta_dict[key], errors, key)
-            meta_dict[key] = normal_datetime
-
-        # Verify workflow model ID structure
-        if key == "model_workflow_id" and not REGEX_DICT["workflow_pattern"].fullmatch(value):
-            errors["workflow_id_format"] = "Model workflow ID is incorrectly formatted: expected a-bc123"
-
-        # Verify variant label structure
-        if key == "variant_label" and not REGEX_DICT["variant_pattern"].fullmatch(value):
-            errors["label_format"] = "Variant label is incorrectly formatted: expected r1i1p1f2 like format"
-
-        # Verify that atmospheric timestep is an integer
-        if key == "atmos_timestep" and (not value.isdigit() or int(value) < 0):
-            errors["timestep_logic"] = "Atmospheric timestep is invalid"
-
-    # Confirm that end_time is not earlier than start_time.
-    parser = parse.TimePointParser()
+        validator = VALIDATORS.get(key)
+        if validator:
+            validator(value, meta_dict, errors)
+
+    # Verify datetime inputs, including the branch dates when a parent is expected.
+    if meta_dict.get("branch_method") == "standard":
+        datetime_fields = STANDARD_DATETIME_FIELDS
+    else:
+        datetime_fields = DATETIME_FIELDS
+    time_points = {}
+    for key in sorted(datetime_fields & meta_dict.keys()):
+        meta_dict[key], time_points[key] = normalise_datetime(meta_dict[key])
+    invalid_datetimes = [key for key, time_point in time_points.items() if time_point is None]
+    if invalid_datetimes:
+        errors["datetime"] = f"Invalid datetime format for {', '.join(invalid_datetimes)}"
+
+    # Confirm that end_time is not earlier than start_time, reusing the time points parsed above.
     if "datetime" not in errors:
-        if parser.parse(meta_dict["end_date"]) < parser.parse(meta_dict["start_date"]):
+        if time_points["end_date"] < time_points["start_date"]:
             errors["datetime_logic"] = "End date cannot be earlier than start date"
 
     return errors
@@ -204,16 +273,10 @@ def format_warning_message(errors: dict[str, str]) -> str:
     str
         A human readable message detailing all warnings.
     """
-    warnings = []
-    for key, value in errors.items():
-        clean_key = key.strip().capitalize().replace("_", " ")
-        clean_value = value.strip().lower().replace("_", " ")
-        warning = clean_key + " warning " + "(" + clean_value + ")."
-        warnings.append(warning)
-
-    warnings = "\n".join(warnings)
-
-    return warnings
+    return "\n".join(
+        f"{key.strip().capitalize().replace('_', ' ')} warning ({value.strip().lower().replace('_', ' ')})."
+        for key, value in errors.items()
+    )
 
 
 def create_filename(meta_dict: dict[str, str]) -> str:
@@ -252,26 +315,11 @@ def sort_to_categories(meta_dict: dict[str, str]) -> dict[dict[str, str]]:
     dict[dict[str, str]]
         A cleaned, organised dictionary containing the validated metadata keys and values from the issue form.
     """
-    metadata_dict = {}
-    data_dict = {}
-    misc_dict = {}
-    organised_metadata = {}
-
-    # Categorise keys into sections that match the request.cfg mapping.
-    for key, value in meta_dict.items():
-        if key in METADATA:
-            metadata_dict[key] = value
-        elif key in DATA:
-            data_dict[key] = value
-        elif key in MISC:
-            misc_dict[key] = value
-
-    # Re map organised keys as nested dictionaries.
-    organised_metadata["[metadata]"] = metadata_dict
-    organised_metadata["[data]"] = data_dict
-    organised_metadata["[misc]"] = misc_dict
-
-    return organised_metadata
+    # Categorise keys into nested sections that match the request.cfg mapping, keeping the CV order of the keys.
+    return {
+        f"[{section}]": {key: value for key, value in meta_dict.items() if key in fields}
+        for section, fields in SECTION_FIELDS.items()
+    }
 
 
 def format_cfg_file(output_file: Path, organised_metadata: dict[str, str]) -> None:
@@ -284,13 +332,16 @@ def format_cfg_file(output_file: Path, organised_metadata: dict[str, str]) -> No
     organised_metadata : dict[str, str]
         A cleaned, organised dictionary containing the validated metadata keys and values from the issue form.
     """
+    parts = []
+    for key, value in organised_metadata.items():
+        parts.append(f"{key}\n")
+        if isinstance(value, dict):
+            for k, v in value.items():
+                parts.append(f"{k} = {v}\n")
+            parts.append("\n")
+
     with open(output_file, "w") as f:
-        for key, value in organised_metadata.items():
-            f.write(f"{key}\n")
-            if isinstance(value, dict):
-                for k, v in value.items():
-                    f.write(f"{k} = {v}\n")
-                f.write("\n")
+        f.write("".join(parts))
 
 
 def main() -> None:
@@ -298,12 +349,13 @@ def main() -> None:
     issue_body = get_issue()['body']
 
     # Find key-value pairs and map them to dictionary process.
-    match = re.findall(r"### (.+?)\n\s*\n?(.+)", issue_body)
-    meta_dict = process_metadata(match)
+    fields = (match.groups() for match in ISSUE_FIELD_PATTERN.finditer(issue_body))
+    meta_dict = process_metadata(fields)
     print("Extracting issue body...  SUCCESSFUL")
 
-    # Validate and organise dictionary content.
-    errors = validate_meta_content(meta_dict)
+    # Set the calendar used to parse datetimes, then validate and organise dictionary content.
+    errors = set_calendar(meta_dict["calendar"])
+    errors = validate_meta_content(meta_dict, errors)
     organised_metadata = sort_to_categories(meta_dict)
 
     # Create output file.
@@ -0,0 +1,121 @@
+# (C) British Crown Copyright 2025, Met Office.
+# Please see LICENSE.md for license details.
+"""A lightweight parser for the simple INI style workflow metadata configuration files.
+
+The metadata cfg files only contain section headers and single line key-value pairs, so they can be parsed with two
+precompiled regexes rather than the more general (and considerably slower) configparser.ConfigParser. Keys are lower
+cased and values stripped to match the behaviour of ConfigParser, and, as with ConfigParser, a repeated section or a
+repeated key within a section is rejected rather than silently merged or overwritten.
+
+map_files() applies a per-file function across many cfg files, in parallel when there are enough files to benefit.
+"""
+
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, TypeVar
+
+T = TypeVar("T")
+
+# Below this many files the cost of starting worker processes outweighs any gain from running in parallel. Each file
+# takes roughly 50-70 microseconds to parse and check, while starting a pool and passing the results back costs several
+# milliseconds, so the pool only pays off for a few thousand files.
+PARALLEL_MIN_FILES = 2000
+
+SECTION_RE = re.compile(r"^\[([^\]]+)\]\s*$")
+KV_RE = re.compile(r"^([^=\s#;][^=]*?)\s*=\s*(.*)$")
+
+
+def parse_text(text: str, source: str = "<string>") -> dict[str, dict[str, str]]:
+    """Parses the content of a cfg file into a dictionary of sections.
+
+    Parameters
+    ----------
+    text : str
+        The content of the cfg file.
+    source : str
+        The name of the cfg file, used in error messages.
+
+    Returns
+    -------
+    dict[str, dict[str, str]]
+        The key-value pairs of the cfg file, nested by section.
+
+    Raises
+    ------
+    ValueError
+        If the text contains a line that is not a section header, key-value pair, comment or blank, a key-value pair
+        appears before the first section header, or a section or a key within a section is repeated.
+    """
+    result = {}
+    section = None
+
+    for line_number, line in enumerate(text.splitlines(), start=1):
+        stripped = line.strip()
+        if not stripped or stripped[0] in "#;":
+            continue
+
+        section_match = SECTION_RE.match(stripped)
+        if section_match:
+            name = section_match.group(1)
+            if name in result:
+                raise ValueError(f"Duplicate section [{name}] on line {line_number} of {source}")
+            section = result[name] = {}
+            continue
+
+        kv_match = KV_RE.match(stripped)
+        if kv_match is None or section is None:
+            raise ValueError(f"Unable to parse line {line_number} of {source}: {line}")
+        key = kv_match.group(1).strip().lower()
+        if key in section:
+            raise ValueError(f"Duplicate key '{key}' on line {line_number} of {source}")
+        section[key] = kv_match.group(2).strip()
+
+    return result
+
+
+def parse(path: str) -> dict[str, dict[str, str]]:
+    """Reads a single cfg file in one call and parses it into a dictionary of sections.
+
+    Parameters
+    ----------
+    path : str
+        The path of the cfg file to parse.
+
+    Returns
+    -------
+    dict[str, dict[str, str]]
+        The key-value pairs of the cfg file, nested by section.
+
+    Raises
+    ------
+    ValueError
+        If the file cannot be parsed or contains a repeated section or key, see parse_text().
+    """
+    return parse_text(Path(path).read_text(encoding="utf-8"), str(path))
+
+
+def map_files(func: Callable[[str], T], files: list[str]) -> list[T]:
+    """Applies a function to each cfg file, spreading the files across processes when there are enough to benefit.
+
+    Parameters
+    ----------
+    func : Callable[[str], T]
+        The function to apply to each file path. It must be picklable, i.e. defined at module level.
+    files : list[str]
+        The paths of the cfg files.
+
+    Returns
+    -------
+    list[T]
+        The result of func for each file, in the same order as files.
+    """
+    workers = os.cpu_count() or 1
+    if workers == 1 or len(files) < PARALLEL_MIN_FILES:
+        return [func(file) for file in files]
+
+    # Give each worker a single contiguous chunk so that per-process caches are shared across as many files as possible
+    chunksize = -(-len(files) // workers)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(func, files, chunksize=chunksize))
@@ -2,34 +2,58 @@
 # Please see LICENSE.md for license details.
 """This script generates the table and HTML file for CDDS workflow metadata."""
 
+from functools import lru_cache
 from pathlib import Path
-import glob
-from configparser import ConfigParser
+import os
+import fast_cfg
 from constants import (HEADINGS, HEADER_ROW_TEMPLATE, ROW_TEMPLATE, CELL_TEMPLATE, TABLE_TEMPLATE, BGCOLORS,
-                       GITURL_MAPPING, HEADER, FOOTER, HYPERLINK)
+                       GITURL_MAPPING, HYPERLINK)
 
+TEMPLATE_DIR = Path(__file__).parent / "templates"
 
-def get_mappings() -> list[list[str]]:
-    """Read all mappings for a given model and return them as a list of lists.
+
+@lru_cache(maxsize=None)
+def read_template(name: str) -> str:
+    """Reads a HTML template, caching the content so that each file is only read once.
+
+    Parameters
+    ----------
+    name : str
+        The filename of the template within the templates directory.
 
     Returns
     -------
-    list[list[str]]
-        Table data as a list of lists, where the sub lists contain data matching the HEADINGS fields.
+    str
+        The template content.
     """
-    glob_string = Path("workflow_metadata/*.cfg")
-    cfg_files = glob.glob(str(glob_string))
+    return (TEMPLATE_DIR / name).read_text()
 
-    table_data = []
 
-    for cfg_file in cfg_files:
-        print(f"Processing {cfg_file}...")
-        mappings_config_object = ConfigParser()
-        mappings_config_object.read(cfg_file)
-        metadata = mappings_config_object["metadata"]
-        data = mappings_config_object["data"]
+def get_table_row(cfg_file: str) -> list[str]:
+    """Read a single metadata cfg file and return its table row.
+
+    Parameters
+    ----------
+    cfg_file : str
+        The path of the cfg file to read.
+
+    Returns
+    -------
+    list[str]
+        The data matching the HEADINGS fields, followed by the name of the cfg file.
+
+    Raises
+    ------
+    ValueError
+        If the cfg file cannot be parsed or is missing a section or field used in the table.
+    """
+    print(f"Processing {cfg_file}...")
+    try:
+        cfg = fast_cfg.parse(cfg_file)
+        metadata = cfg["metadata"]
+        data = cfg["data"]
 
-        table_data.append([
+        row = [
             data["model_workflow_id"],
             metadata['model_id'],
             data["mass_data_class"],
@@ -40,11 +64,29 @@ def get_mappings() -> list[list[str]]:
             data['start_date'],
             data['end_date'],
             str(Path(cfg_file).stem)
-        ])
-        print("SUCCESSFUL...")
-    table_data = [HEADINGS] + table_data
+        ]
+    except KeyError as err:
+        raise ValueError(f"Unable to build table row for {cfg_file}: missing {err}") from err
+    print("SUCCESSFUL...")
+
+    return row
 
-    return table_data
+
+def get_mappings() -> list[list[str]]:
+    """Read all mappings for a given model and return them as a list of lists.
+
+    The cfg files are independent of each other, so a large number of them are read in parallel across processes.
+
+    Returns
+    -------
+    list[list[str]]
+        Table data as a list of lists, where the sub lists contain data matching the HEADINGS fields.
+    """
+    with os.scandir("workflow_metadata") as entries:
+        cfg_files = [entry.path for entry in entries if entry.is_file(follow_symlinks=False)
+                     and entry.name.endswith(".cfg")]
+
+    return [HEADINGS] + fast_cfg.map_files(get_table_row, cfg_files)
 
 
 def build_table(table_data: list[list[str]]) -> str:
@@ -61,29 +103,30 @@ def build_table(table_data: list[list[str]]) -> str:
         The table_data formatted as a HTML table.
     """
     print("Building HTML table...")
-    html = ''
+    cell_fmt = CELL_TEMPLATE.format
+    row_fmt = ROW_TEMPLATE.format
+    hyperlink_fmt = HYPERLINK.format
+    giturl_fmt = GITURL_MAPPING.format
+    bgcolors = BGCOLORS
+
+    parts = []
     for i, row in enumerate(table_data):
         cell_type = 'th' if i == 0 else 'td'
-        row_html = ''
-        filter_row_html = ''
+        bgcolor = bgcolors[i % len(bgcolors)]
         if i == 0:
-            for entry in row:
-                row_html += CELL_TEMPLATE.format(cell_type, entry)
-                filter_row_html += CELL_TEMPLATE.format(cell_type, '')
-            html += HEADER_ROW_TEMPLATE.format(BGCOLORS[i % len(BGCOLORS)], row_html, filter_row_html)
+            row_html = ''.join([cell_fmt(cell_type, entry) for entry in row])
+            filter_row_html = cell_fmt(cell_type, '') * len(row)
+            parts.append(HEADER_ROW_TEMPLATE.format(bgcolor, row_html, filter_row_html))
             continue
         else:
             filename = row.pop()
-            for entry in row:
-                if entry == table_data[i][0]:
-                    row_html += CELL_TEMPLATE.format(cell_type,
-                                                     HYPERLINK.format(GITURL_MAPPING.format(filename), entry))
-                else:
-                    row_html += CELL_TEMPLATE.format(cell_type, entry)
+            # The first column holds the workflow id, which links to its cfg file
+            row_cells = [cell_fmt(cell_type, hyperlink_fmt(giturl_fmt(filename), row[0]))]
+            row_cells.extend(cell_fmt(cell_type, entry) for entry in row[1:])
 
-            html += ROW_TEMPLATE.format(BGCOLORS[i % len(BGCOLORS)], row_html)
+            parts.append(row_fmt(bgcolor, ''.join(row_cells)))
 
-    table_html = TABLE_TEMPLATE.format(html)
+    table_html = TABLE_TEMPLATE.format(''.join(parts))
     print("SUCCESSFUL...")
 
     return table_html
@@ -98,19 +141,21 @@ def generate_html(table_html: str) -> None:
         The HTML table.
     """
     print("Building full HTML...")
-    html = (HEADER +
-            '<h2>CMIP7 Workflow Metadata</h2>' +
-            '<p> </p>' + '<p>Use the search box to filter rows, e.g. search for "MOHC" or "NERC".</p>' + '<p> </p>' +
-            '<p>To view the full metadata, click the model workflow ID link in the table.</p>' +
-            table_html + FOOTER)
-
     output_directory = Path("metadata_tables")
     output_directory.mkdir(parents=True, exist_ok=True)
 
     output_filepath = output_directory / "index.html"
 
+    # Write the page piece by piece rather than concatenating the whole document in memory first.
     with open(output_filepath, 'w') as f:
-        f.write(html)
+        f.writelines([
+            read_template("header.html"),
+            '<h2>CMIP7 Workflow Metadata</h2>',
+            '<p> </p><p>Use the search box to filter rows, e.g. search for "MOHC" or "NERC".</p><p> </p>',
+            '<p>To view the full metadata, click the model workflow ID link in the table.</p>',
+            table_html,
+            read_template("footer.html"),
+        ])
 
     print("SUCCESSFUL...")
     print(f"Webpage generated successfully\nFor the raw HTML file see {output_filepath}.")
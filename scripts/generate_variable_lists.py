@@ -8,7 +8,7 @@ such as priority level and production labels. Each variable is labelled accordin
 Each variable list is then saved to a plain text file containing the variables for that experiment.
 
 THIS SCRIPT CURRENTLY CONSIDERS GLOBAL VARIABLES ONLY. NON-GLOBAL VARIABLES ARE FILTERED OUT WITHIN THE FUNCTION
-format_variable_names().
+build_experiment_dict().
 
 Example command line usage:
 "python scripts/generate_variable_lists.py reference_information/dr-1.2.2.2_all.json reference_information/mappings.json
@@ -19,12 +19,22 @@ Example command line usage:
 import argparse
 import json
 import os
-from itertools import chain
 from pathlib import Path
 from typing import Union
 
-IGNORED_PRIORITIES = ("med", "low")
-PRIORITY_ORDER = {"# priority=medium": 1, "# priority=low": 2, "# do-not-produce": 3}
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+PRIORITY_LEVELS = (("core", "Core"), ("high", "High"), ("med", "Medium"), ("low", "Low"))
+PRIORITY_COMMENT = {"core": "", "high": "", "med": " # priority=medium", "low": " # priority=low"}
+PRIORITY_ORDER = {" # priority=medium": 1, " # priority=low": 2, " # do-not-produce": 3}
 
 
 def set_arg_parser() -> argparse.Namespace:
@@ -56,6 +66,9 @@ def set_arg_parser() -> argparse.Namespace:
 def open_source_jsons(path: Path) -> Union[dict, list[dict]]:
     """Opens and reads a single JSON file.
 
+    The file is parsed with the optional orjson package where it is installed, otherwise the standard library json
+    module is used.
+
     Parameters
     ----------
     path: Path
@@ -71,11 +84,12 @@ def open_source_jsons(path: Path) -> Union[dict, list[dict]]:
     FileNotFoundError
         If the file does not exist at the given path.
     json.JSONDecodeError
-        If the JSON file structure is invalid.
+        If the JSON file structure is invalid (orjson.JSONDecodeError is a subclass of this).
     """
     try:
-        with open(path, "r") as f:
-            file = json.load(f)
+        with open(path, "rb") as f:
+            content = f.read()
+        file = orjson.loads(content) if orjson is not None else json.loads(content)
 
     except FileNotFoundError:
         print(f"File not found: {path}.")
@@ -85,192 +99,68 @@ def open_source_jsons(path: Path) -> Union[dict, list[dict]]:
     return file
 
 
-def get_grouped_priority_labels(experiment_dict: dict, experiment: str) -> dict[str, set]:
-    """Creates a dictionary of labels grouped by priority (core, high, med, low) for a single experiment.
-
-    Parameters
-    ----------
-    experiment_dict: dict
-        The dictionary containing all experiments and their associated variables.
-    experiment: str
-        The experiment whose variables are being updated.
-
-    Returns
-    -------
-    dict[str, set]
-        A dictionary of labels grouped by priority (core, high, med, low).
-    """
-    experiment_data = experiment_dict["experiment"][experiment]
-
-    return {
-        "core": set(experiment_data.get("Core", [])),
-        "high": set(experiment_data.get("High", [])),
-        "med": set(experiment_data.get("Medium", [])),
-        "low": set(experiment_data.get("Low", [])),
-    }
-
+def open_data_request(path: Path, experiments: list[str]) -> dict:
+    """Opens the data request file, keeping only its header and the requested experiments.
 
-def set_priority_comments(experiment_dict: dict, experiment: str) -> dict[str, str]:
-    """Sets the comment to be appended to each variable based off of their priority level for a single experiment.
+    When ijson is installed the file is streamed so that only one experiment at a time is held in memory alongside
+    those requested. Otherwise the whole file is loaded with open_source_jsons() and then filtered.
 
     Parameters
     ----------
-    experiment_dict: dict
-        The dictionary containing all experiments and their associated variables.
-    experiment: str
-        The experiment whose variables are being updated.
-
-    Returns
-    -------
-    dict[str, str]
-        A dictionary of comments created based on priority level.
-    """
-    priority_comments = {}
-    priority_dict = get_grouped_priority_labels(experiment_dict, experiment)
-    for level, variables in priority_dict.items():
-        if level in IGNORED_PRIORITIES:
-            for variable in variables:
-                priority_comments[variable] = f" # priority={'medium' if level == 'med' else 'low'}"
-
-    return priority_comments
-
-
-def get_all_variables(experiment_dict: dict, experiment: str) -> chain:
-    """Creates a chain of all variables used for a single experiment.
-
-    Parameters
-    ----------
-    experiment_dict: dict
-        The dictionary containing all experiments and their associated variables.
-    experiment: str
-        The experiment whose variables are being updated.
-
-    Returns
-    -------
-    chain
-        A chain of all priority labels.
-    """
-    priority_dict = get_grouped_priority_labels(experiment_dict, experiment)
-
-    return chain(priority_dict["core"], priority_dict["high"], priority_dict["med"], priority_dict["low"])
-
-
-def update_variables_with_priority(experiment_dict: dict, experiment: str, variable_dict: dict) -> dict[str, str]:
-    """Update the variables for a single experiment with priority comments.
-
-    Parameters
-    ----------
-    experiment_dict: dict
-        The dictionary containing all experiments and their associated variables.
-    experiment: str
-        The experiment whose variables are being updated.
-    variable_dict: dict
-        A dictionary to populate with the updated variable data.
-
-    Returns
-    -------
-    dict[str, str]
-        A dictionary of variable name and priority level key-value pairs for a single experiment.
-    """
-    priority_comments = set_priority_comments(experiment_dict, experiment)
-    all_labels = get_all_variables(experiment_dict, experiment)
-
-    # Check all labels against their priority status and comment accordingly.
-    for variable in all_labels:
-        variable_dict[variable] = priority_comments.get(variable, "")
-
-    return variable_dict
-
-
-def get_mapping(mappings_dict: list[dict], variable: str) -> dict:
-    """Identifies the correct dictionary within the mappings.json to read from.
-
-    Parameters
-    ----------
-    mappings_dict: list[dict]
-        The dictionary containing mapping information for all variables.
-    variable: str
-        The variable whose mapping information is required.
+    path: Path
+        The path of the data request file.
+    experiments: list[str]
+        The experiments to keep.
 
     Returns
     -------
     dict
-        The mapping information for a single variable.
+        The data request header and the requested experiments and their associated variables.
     """
-    for mapping in mappings_dict:
-        if variable == mapping["branded_variable"]:
-            mapping = mapping
-            break
-
-    return mapping
-
-
-def identify_not_produced(
-    experiment_dict: dict, experiment: str, mappings_dict: list[dict], variable_dict: dict[str, str]
-) -> dict[str, str]:
-    """Identify all variables marked as "do not produce" in a single experiment. Overriding any existing "priority"
-    value in the dict is acceptable since do-not-produce takes precedence.
+    wanted = set(experiments)
 
-    Parameters
-    ----------
-    experiment_dict: dict
-        The dictionary containing all experiments and their associated variables.
-    experiment: str
-        The experiment whose variables are being updated.
-    mappings_dict: list[dict]
-        The dictionary containing mapping information for all variables.
-    variable_dict: dict[str, str]
-        The dictionary of name and priority level key-value pairs for a single experiment.
-
-    Returns
-    -------
-    dict[str, str]
-        An updated dictionary containing production status for variables marked "do-not-produce".
-    """
-    all_labels = get_all_variables(experiment_dict, experiment)
-    for variable in all_labels:
-        mapping = get_mapping(mappings_dict, variable)
-        labels = mapping.get("labels")
+    if ijson is None:
+        dr_info = open_source_jsons(path)
+        return {
+            "Header": dr_info["Header"],
+            "experiment": {key: value for key, value in dr_info["experiment"].items() if key in wanted},
+        }
 
-        if "do-not-produce" in labels:
-            variable_dict[variable] = " # do-not-produce"
+    with open(path, "rb") as f:
+        header = next(ijson.items(f, "Header"))
+        f.seek(0)
+        experiment_data = {key: value for key, value in ijson.kvitems(f, "experiment") if key in wanted}
 
-    return variable_dict
+    return {"Header": header, "experiment": experiment_data}
 
 
-def get_streams(experiment_dict: dict, experiment: str, mappings_dict: list[dict]) -> dict[str, str]:
-    """Creates a dictionary for variables and their associated output stream for a single experiment.
+def build_mapping_index(mappings_dict: list[dict]) -> dict[str, dict]:
+    """Indexes the mappings.json entries by branded variable so that each variable can be looked up directly.
 
     Parameters
     ----------
-    experiment_dict: dict
-        The dictionary containing all experiments and their associated variables.
-    experiment: str
-        The experiment whose variables are being updated.
     mappings_dict: list[dict]
         The dictionary containing mapping information for all variables.
 
     Returns
     -------
-    dict[str, str]
-        A dictionary containing variables and their associated output stream.
+    dict[str, dict]
+        The mapping information for each variable keyed by branded variable. Where a variable has several mappings
+        the first is used.
     """
-    streams = {}
+    mapping_index = {}
+    for mapping in mappings_dict:
+        mapping_index.setdefault(mapping["branded_variable"], mapping)
 
-    # Access stash entries for each variable and check if it contains values.
-    all_labels = get_all_variables(experiment_dict, experiment)
-    for variable in all_labels:
-        mapping = get_mapping(mappings_dict, variable)
-        streams[variable] = mapping.get("stream")
+    return mapping_index
 
-    return streams
 
+def build_experiment_dict(experiment_dict: dict, experiment: str, mapping_index: dict[str, dict]) -> dict[str, str]:
+    """Creates the reformatted variable names and their priority/production comments for a single experiment.
 
-def reformat_variable_names(
-    experiment_dict: dict, experiment: str, mappings_dict: list[dict], variable_dict: dict
-) -> dict[str, str]:
-    """Reformats the name of each variable from realm.variable.branding.frequency.region to
-    realm/variable_branding@frequency:stream for a single experiment.
+    Each variable is visited once: its comment is set from its priority level, overridden by "do-not-produce" where
+    the variable carries that label, and its name is reformatted from realm.variable.branding.frequency.region to
+    realm/variable_branding@frequency:stream. Non global variables are filtered out.
 
     Parameters
     ----------
@@ -278,46 +168,50 @@ def reformat_variable_names(
         The dictionary containing all experiments and their associated variables.
     experiment: str
         The experiment whose variables are being updated.
-    mappings_dict: list[dict]
-        The dictionary containing mapping information for all variables.
-    variable_dict: dict
-        An updated dictionary containing production status for variables marked "do-not-produce".
+    mapping_index: dict[str, dict]
+        The mapping information for each variable keyed by branded variable.
 
     Returns
     -------
     dict[str, str]
-        An updated dictionary containing the reformatted variable names as keys and priority/production status as
-        values.
+        A dictionary containing the reformatted variable names as keys and priority/production status as values.
 
     Raises
     ------
     KeyError
         If the original variable name cannot be split into parts as expected.
     """
+    experiment_data = experiment_dict["experiment"][experiment]
     renamed_variable_dict = {}
-    streams = get_streams(experiment_dict, experiment, mappings_dict)
 
-    # Reformat all original variable names to realm/variable_branding@frequency:stream.
-    for variable, comment in variable_dict.items():
-        parts = variable.split(".")
-        if len(parts) < 5:
-            raise KeyError(f"{variable} has unexpected format. Expected: realm.variable.branding.frequency.region")
+    for level, label in PRIORITY_LEVELS:
+        level_comment = PRIORITY_COMMENT[level]
+
+        for variable in experiment_data.get(label, []):
+            parts = variable.split(".")
+            if len(parts) < 5:
+                raise KeyError(f"{variable} has unexpected format. Expected: realm.variable.branding.frequency.region")
+
+            realm, variable_name, branding, frequency, region = parts[:5]
+
+            # Filter out any non global variables
+            if region not in ("glb", "GLB"):
+                continue
 
-        realm, variable_name, branding, frequency, region = parts[:5]
-        stream = streams.get(variable, "")
+            # Do-not-produce takes precedence over any priority comment.
+            mapping = mapping_index.get(variable, {})
+            comment = " # do-not-produce" if "do-not-produce" in mapping.get("labels", []) else level_comment
 
-        # Filter out any non global variables
-        if region in ("glb", "GLB"):
+            # Reformat the original variable name to realm/variable_branding@frequency:stream.
+            stream = mapping.get("stream")
             new_variable_name = (f"{realm}/{variable_name}_{branding}@{frequency}:{stream}" if stream else
                                  f"{realm}/{variable_name}_{branding}@{frequency}")
-
-            # Create new dictionary with the reformatted variable names to avoid key errors in the original dict.
             renamed_variable_dict[new_variable_name] = comment
 
     return renamed_variable_dict
 
 
-def format_outfile_content(renamed_variable_dict: dict[str, str]) -> list[str]:
+def format_outfile_content(renamed_variable_dict: dict[str, str]) -> list[tuple[int, str]]:
     """Reformats the key value pairs into single line plain text for a single experiment.
 
     Parameters
@@ -328,37 +222,17 @@ def format_outfile_content(renamed_variable_dict: dict[str, str]) -> list[str]:
 
     Returns
     -------
-    list[str]
-        A list of lines to populate the plain text file with.
+    list[tuple[int, str]]
+        The lines to populate the plain text file with, each paired with its sort order. Variables with no specified
+        priority are assigned order 0 so that they appear at the top of the variable list.
     """
     lines = []
     for variable, comment in renamed_variable_dict.items():
-        lines.append(f"#{variable}{comment}\n" if comment else f"{variable}{comment}\n")
+        lines.append((PRIORITY_ORDER.get(comment, 0), f"#{variable}{comment}\n" if comment else f"{variable}\n"))
 
     return lines
 
 
-def sort_key(line: str) -> tuple[dict[str, int], int]:
-    """The custom sort function passed to the sorted() function to define the variable order for a single experiment.
-
-    Parameters
-    ----------
-    line: str
-        A single line containing a single variable name and associated comments.
-
-    Returns
-    -------
-    tuple[dict[str, int], int]
-        The order of each label based on priority, variables with no specified priority will be assigned order 0 so that
-        they appear at the top of the variable list.
-    """
-    for label in PRIORITY_ORDER:
-        if label in line:
-            return PRIORITY_ORDER[label]
-
-    return 0
-
-
 def save_outfile(outdir: Path, experiment: str, renamed_variable_dict: dict[str, str]) -> None:
     """Saves a single file to a plain text format.
 
@@ -374,10 +248,10 @@ def save_outfile(outdir: Path, experiment: str, renamed_variable_dict: dict[str,
     """
     outfile = outdir / f"{experiment}.txt"
     lines = format_outfile_content(renamed_variable_dict)
+    lines.sort()
 
     with open(outfile, "w") as f:
-        for line in sorted(lines, key=sort_key):
-            f.write(line)
+        f.writelines(line for _, line in lines)
 
 
 def generate_variable_lists() -> None:
@@ -386,8 +260,8 @@ def generate_variable_lists() -> None:
     """
     # Call required source files.
     args = set_arg_parser()
-    experiment_dict = open_source_jsons(Path(args.dr_info))
-    mappings_dict = open_source_jsons(Path(args.mappings))
+    experiment_dict = open_data_request(Path(args.dr_info), args.experiments)
+    mapping_index = build_mapping_index(open_source_jsons(Path(args.mappings)))
 
     # Create output file path.
     outdir = Path(f"variables_glb/{experiment_dict['Header']['dreq content version']}")
@@ -395,16 +269,7 @@ def generate_variable_lists() -> None:
 
     # Loop over all listed experiments.
     for experiment in args.experiments:
-        variable_dict = {}
-
-        functions = [
-            update_variables_with_priority(experiment_dict, experiment, variable_dict),
-            identify_not_produced(experiment_dict, experiment, mappings_dict, variable_dict),
-            reformat_variable_names(experiment_dict, experiment, mappings_dict, variable_dict),
-        ]
-        for f in functions:
-            variable_dict = f
-
+        variable_dict = build_experiment_dict(experiment_dict, experiment, mapping_index)
         save_outfile(outdir, experiment, variable_dict)
 
     print(f"SUCCESSFULLY GENERATED {len(args.experiments)} FILES")
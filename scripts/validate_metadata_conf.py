@@ -6,28 +6,41 @@ This script checks for missing sections, unexpected keys, and invalid values
 in workflow configuration files.
 """
 
-import configparser
-import glob
-import re
+import os
 import sys
-from pathlib import Path
+from functools import lru_cache
 
 import metomi.isodatetime.parsers as parse
 from constants import (
-    DATA,
+    COMPILED_REGEX,
     DATETIME_FIELDS,
-    METADATA,
-    MISC,
+    NO_RESPONSE,
     PARENT_REQUIRED,
-    REGEX_FORMAT,
     REQUIRED,
+    SECTION_FIELDS,
     SECTIONS,
+    STANDARD_DATETIME_FIELDS,
 )
+import fast_cfg
 from metomi.isodatetime.exceptions import ISO8601SyntaxError, IsodatetimeError
 
-REGEX_DICT = {
-    "workflow_pattern": re.compile(REGEX_FORMAT["model_workflow_id"]),
-    "variant_pattern": re.compile(REGEX_FORMAT["variant_label"]),
+TIME_POINT_PARSER = parse.TimePointParser()
+FORMAT_VALIDATORS = {
+    "model_workflow_id": COMPILED_REGEX["model_workflow_id"].fullmatch,
+    "variant_label": COMPILED_REGEX["variant_label"].fullmatch,
+    "atmos_timestep": lambda value: value.isascii() and value.isdigit(),
+}
+
+# The fields that must be populated ("require") or left blank ("forbid") for a given value of a field.
+CROSS_FIELD_RULES = {
+    "branch_method": {
+        "standard": ("require", PARENT_REQUIRED),
+        "no parent": ("forbid", PARENT_REQUIRED),
+    },
+    "mass_data_class": {
+        "ens": ("require", ("mass_ensemble_member",)),
+        "crum": ("forbid", ("mass_ensemble_member",)),
+    },
 }
 
 
@@ -39,32 +52,46 @@ def get_metadata_files() -> list[str]:
     list[str]
         List of cfg files to be checked.
     """
-    glob_string = Path("workflow_metadata/*.cfg")
-    cfg_files = glob.glob(str(glob_string))
+    with os.scandir("workflow_metadata") as entries:
+        cfg_files = [entry.path for entry in entries if entry.is_file(follow_symlinks=False)
+                     and entry.name.endswith(".cfg")]
 
     return cfg_files
 
 
-def validate_structure(config: configparser, result: dict, file: str) -> dict:
-    """Validates the structure of a single .cfg file.
+@lru_cache(maxsize=4096)
+def is_valid_datetime(value: str) -> bool:
+    """Checks whether a datetime string can be parsed, caching the result since many files share the same dates.
 
     Parameters
     ----------
-    config : configparser
-        The config parser.
-    result : dict
-        The dictionary containing the details of any validation failures.
-    file : str
-        The file being validated.
+    value : str
+        The datetime string to check.
 
     Returns
     -------
-    dict
-        The dictionary containing the details of any validation failures.
+    bool
+        True if the datetime string is valid.
     """
-    file_results = result[file]
-    sections_in_config = set(config.sections())
-    SECTION_DICT = {"metadata": METADATA, "data": DATA, "misc": MISC}
+    try:
+        TIME_POINT_PARSER.parse(value)
+    except (IsodatetimeError, ISO8601SyntaxError):
+        return False
+
+    return True
+
+
+def validate_structure(config: dict[str, dict[str, str]], file_results: dict) -> None:
+    """Validates the structure of a single .cfg file.
+
+    Parameters
+    ----------
+    config : dict[str, dict[str, str]]
+        The parsed cfg file.
+    file_results : dict
+        The dictionary containing the details of any validation failures for the file, updated in place.
+    """
+    sections_in_config = set(config)
 
     # Verify the correct sections are present in the correct order
     unexpected_sections = set()
@@ -76,7 +103,7 @@ def validate_structure(config: configparser, result: dict, file: str) -> dict:
     # Verify the correct keys are in the correct section
     for section in SECTIONS:
         keys = set(config[section].keys()) if section in config else set()
-        target = set(SECTION_DICT[section])
+        target = SECTION_FIELDS[section]
 
         missing_keys = target - keys
         unexpected_keys = keys - target if section not in missing_sections else set()
@@ -88,115 +115,80 @@ def validate_structure(config: configparser, result: dict, file: str) -> dict:
         file_results["missing_keys"] = list(missing_keys)
         file_results["unexpected_keys"] = list(unexpected_keys)
 
-    return result
-
 
-def validate_required_fields(config: configparser, result: dict, file: str) -> dict:
+def validate_required_fields(config: dict[str, dict[str, str]], file_results: dict) -> None:
     """Validates the contents of the required fields for a single .cfg file.
 
     Parameters
     ----------
-    config : configparser
-        The config parser.
-    result : dict
-        The dictionary containing the details of any validation failures.
-    file : str
-        The file being validated.
-
-    Returns
-    -------
-    dict
-        The dictionary containing the details of any validation failures.
+    config : dict[str, dict[str, str]]
+        The parsed cfg file.
+    file_results : dict
+        The dictionary containing the details of any validation failures for the file, updated in place.
     """
-    file_results = result[file]
     missing_values = set()
     unexpected_values = set()
 
     # Verify that all required fields are not None
-    for section in config.sections():
-        section_data = config[section]
+    for section_data in config.values():
         for key, value in section_data.items():
             if key in REQUIRED and not value:
                 missing_values.add(key)
 
-            if key == "branch_method":
-                if value == "standard":
-                    for parent_key in PARENT_REQUIRED:
-                        if section_data.get(parent_key) in (None, ""):
-                            missing_values.add(key)
-                elif value == "no parent":
-                    for parent_key in PARENT_REQUIRED:
-                        if section_data.get(parent_key) not in (None, ""):
-                            unexpected_values.add(key)
-
-            if key == "mass_data_class":
-                if value == "ens" and not section_data.get("mass_ensemble_member"):
-                    missing_values.add(key)
-                if value == "crum" and section_data.get("mass_ensemble_member"):
-                    unexpected_values.add(key)
+            # Verify any fields that this field's value requires or forbids
+            action, fields = CROSS_FIELD_RULES.get(key, {}).get(value, (None, ()))
+            if action == "require" and not all(section_data.get(field) for field in fields):
+                missing_values.add(key)
+            elif action == "forbid" and any(section_data.get(field) for field in fields):
+                unexpected_values.add(key)
 
     if any([missing_values, unexpected_values]):
         file_results["failures"] = True
         file_results["missing_values"] = list(missing_values)
         file_results["unexpected_values"] = list(unexpected_values)
 
-    return result
 
-
-def validate_field_inputs(config: configparser, result: dict, file: str) -> dict:
+def validate_field_inputs(config: dict[str, dict[str, str]], file_results: dict) -> None:
     """Validates the inputs of a single .cfg file.
 
     Parameters
     ----------
-    config : configparser
-        The config parser.
-    result : dict
-        The dictionary containing the details of any validation failures.
-    file : str
-        The file being validated.
-
-    Returns
-    -------
-    dict
-        The dictionary containing the details of any validation failures.
+    config : dict[str, dict[str, str]]
+        The parsed cfg file.
+    file_results : dict
+        The dictionary containing the details of any validation failures for the file, updated in place.
     """
-    file_results = result[file]
     invalid_values = set()
-    parser = parse.TimePointParser()
-    for section in config.sections():
-        for key, value in config[section].items():
+
+    # The branch dates are only expected to hold datetimes when the workflow has a parent.
+    if config.get("metadata", {}).get("branch_method") == "standard":
+        datetime_fields = STANDARD_DATETIME_FIELDS
+    else:
+        datetime_fields = DATETIME_FIELDS
+
+    # Bind the methods used for every key to locals ahead of the loop.
+    add_invalid = invalid_values.add
+    get_validator = FORMAT_VALIDATORS.get
+
+    for section_data in config.values():
+        for key, value in section_data.items():
             # Verify datetime inputs
-            if key == "branch_method" and value == "standard":
-                DATETIME_FIELDS.add("branch_date_in_child")
-                DATETIME_FIELDS.add("branch_date_in_parent")
-            if key in DATETIME_FIELDS:
-                try:
-                    parser.parse(value)
-                except (IsodatetimeError, ISO8601SyntaxError):
-                    invalid_values.add(key)
-
-            # Verify workflow model ID structure
-            if key == "model_workflow_id" and not REGEX_DICT["workflow_pattern"].fullmatch(value):
-                invalid_values.add(key)
-
-            # Verify variant label structure
-            if key == "variant_label" and not REGEX_DICT["variant_pattern"].fullmatch(value):
-                invalid_values.add(key)
-
-            # Verify that atmospheric timestep is an integer
-            if key == "atmos_timestep" and (not value.isdigit() or int(value) < 0):
-                invalid_values.add(key)
+            if key in datetime_fields and not is_valid_datetime(value):
+                add_invalid(key)
+
+            # Verify the format of the workflow model ID, variant label and atmospheric timestep
+            validator = get_validator(key)
+            if validator and not validator(value):
+                add_invalid(key)
 
             # Verify that no fields have the value "_No response_"
-            if value == "_No response_":
-                invalid_values.add(key)
+            if value == NO_RESPONSE:
+                add_invalid(key)
 
     if invalid_values:
         file_results["failures"] = True
         file_results["invalid_values"] = list(invalid_values)
 
-    return result
-
 
 def create_failure_report(result: dict) -> None:
     """Prints back any validation errors to the user.
@@ -225,29 +217,40 @@ def create_failure_report(result: dict) -> None:
         sys.exit(1)
 
 
+def validate_file(file: str) -> dict:
+    """Performs all validations on a single .cfg file.
+
+    Parameters
+    ----------
+    file : str
+        The file being validated.
+
+    Returns
+    -------
+    dict
+        The dictionary containing the details of any validation failures for the file.
+    """
+    file_results = {
+        "file": file,
+        "failures": False,
+    }
+
+    config = fast_cfg.parse(file)
+
+    # Perform validation
+    validate_structure(config, file_results)
+    validate_required_fields(config, file_results)
+    validate_field_inputs(config, file_results)
+
+    return file_results
+
+
 def main() -> None:
     """Holds the main body of the script."""
-    result = {}
-
     cfg_files = get_metadata_files()
-    for file in cfg_files:
-        result[file] = {
-            "file": file,
-            "failures": False,
-        }
-
-        # A new parser must be created for each file since ConfigParser.read() is cumulative
-        config = configparser.ConfigParser()
-        config.read(file)
-
-        # Perform validation
-        validators = [
-            validate_structure(config, result, file),
-            validate_required_fields(config, result, file),
-            validate_field_inputs(config, result, file),
-        ]
-        for v in validators:
-            result = v
+
+    # Each file is validated independently, so a large number of files can be spread across processes.
+    result = dict(zip(cfg_files, fast_cfg.map_files(validate_file, cfg_files)))
 
     create_failure_report(result)
 
@@ -2,64 +2,138 @@
 # Please see LICENSE.md for license details.
 """This script validates the coding quality of all python scripts using pycodestyle."""
 
+import json
+import os
 from pathlib import Path
-import glob
+
 import pycodestyle
 
+# Directories that hold caches, virtual environments or build output rather than repository code.
+EXCLUDED_DIRS = frozenset(["__pycache__", "venv", "build", "dist"])
+MAX_LINE_LENGTH = 120
+
+# Records the modification time and size of each file at the point it last passed, so unchanged files can be skipped.
+# The header ties the cache to the pycodestyle version and options, so the whole cache is discarded if either changes.
+CACHE_FILE = Path(".pycodestyle_cache.json")
+CACHE_HEADER = {"pycodestyle": pycodestyle.__version__, "max_line_length": MAX_LINE_LENGTH}
+
 
 def glob_files() -> list[str]:
-    """Creates a list of all python files in the repository.
+    """Creates a list of all python files in the repository, skipping hidden, cache, environment and build directories.
 
     Returns
     -------
     list[str]
         A list of all python files in the repository.
     """
-    glob_string = Path("**/*.py")
-    files = glob.glob(str(glob_string))
+    files = []
+    for root, dirs, filenames in os.walk("."):
+        dirs[:] = [d for d in dirs if not (d.startswith(".") or d in EXCLUDED_DIRS or d.endswith(".egg-info"))]
+        files.extend(os.path.relpath(os.path.join(root, f)) for f in filenames if f.endswith(".py"))
 
     return files
 
 
-def check_file(file: str, style_guide: pycodestyle.StyleGuide, count: int) -> int:
-    """Applies a pycodestyle check to a single file.
+def load_cache() -> dict[str, list[int]]:
+    """Loads the modification time and size of each file that passed the previous validation run.
+
+    Returns
+    -------
+    dict[str, list[int]]
+        The [st_mtime_ns, st_size] of each previously passed file, keyed by file path. Empty if there is no cache, it
+        cannot be read or it was written with a different pycodestyle version or options.
+    """
+    try:
+        cache = json.loads(CACHE_FILE.read_text())
+    except (OSError, ValueError):
+        return {}
+
+    if not isinstance(cache, dict) or cache.get("header") != CACHE_HEADER:
+        return {}
+
+    return cache.get("files", {})
+
+
+def file_key(file: str) -> list[int]:
+    """Gets the modification time and size used to detect whether a file has changed.
 
     Parameters
     ----------
     file : str
-        The file to be checked.
-    style_guide : pycodestyle.StyleGuide
-        The style guide format to be applied during the check.
-    count : int
-        The number of files that have passed the style guide check.
+        The file to stat.
 
     Returns
     -------
-    int
-        The number of files that have passed the style guide check.
+    list[int]
+        The [st_mtime_ns, st_size] of the file.
     """
-    print(f"\nChecking {file}...")
-
-    issues = style_guide.check_files([file])
-    if issues.total_errors == 0:
-        print("FILE OK")
-        count += 1
-
-    return count
+    st = os.stat(file)
+    return [st.st_mtime_ns, st.st_size]
+
+
+class FileResultReport(pycodestyle.StandardReport):
+    """A pycodestyle report that prints the outcome of each file checked and counts the files that pass."""
+
+    def __init__(self, options) -> None:
+        super().__init__(options)
+        self.passed_files = []
+
+    def init_file(self, filename: str, lines: list[str], expected: tuple, line_offset: int) -> None:
+        """Signals the start of a new file to be checked.
+
+        Parameters
+        ----------
+        filename : str
+            The file being checked.
+        lines : list[str]
+            The lines of the file.
+        expected : tuple
+            The error codes expected in the file.
+        line_offset : int
+            The offset applied to reported line numbers.
+        """
+        print(f"\nChecking {filename}...")
+        super().init_file(filename, lines, expected, line_offset)
+
+    def get_file_results(self) -> int:
+        """Prints any errors for the file just checked and records whether it passed.
+
+        Returns
+        -------
+        int
+            The number of errors found in the file.
+        """
+        file_errors = super().get_file_results()
+        if file_errors == 0:
+            print("FILE OK")
+            self.passed_files.append(self.filename)
+
+        return file_errors
 
 
 def main() -> None:
     """Holds the main body of the function."""
-    style_guide = pycodestyle.StyleGuide(quiet=False, max_line_length=120)
-
-    count = 0
+    style_guide = pycodestyle.StyleGuide(quiet=False, max_line_length=MAX_LINE_LENGTH, reporter=FileResultReport)
 
     files = glob_files()
-    for file in files:
-        count = check_file(file, style_guide, count)
+    cache = load_cache()
+    file_keys = {file: file_key(file) for file in files}
+
+    # Skip any file that is unchanged since it last passed
+    unchanged_files = [file for file in files if cache.get(file) == file_keys[file]]
+    for file in unchanged_files:
+        print(f"\nSkipping {file}, unchanged since last validated...")
+
+    # Check the remaining files in one call so that the checker and report are only set up once.
+    changed_files = [file for file in files if cache.get(file) != file_keys[file]]
+    report = style_guide.check_files(changed_files)
+
+    passed_files = unchanged_files + report.passed_files
+    CACHE_FILE.write_text(json.dumps({"header": CACHE_HEADER,
+                                      "files": {file: file_keys[file] for file in passed_files}}))
 
     print("\n" + "="*60)
-    print(f"{count}/{len(files)} scripts successfully validated...")
+    print(f"{len(passed_files)}/{len(files)} scripts successfully validated...")
     print("="*60)
 
 